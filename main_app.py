@@ -1,11 +1,13 @@
 # main_app.py
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import numpy as np
+import pandas as pd
+from scipy.stats import gaussian_kde
 
 # Import classes from utils.py
-from utils import DataLoader, DataProcessor, PathReconstructor
+from utils import DataLoader, DataProcessor, PathReconstructor, decimate, downsample, fast_describe, split_s3_url, time_vector
 
 def main():
     st.title("CorrDash: Dashboard for Data Analysis and Visualization")
@@ -25,73 +27,108 @@ def main():
     elif data_source == "S3 URL":
         s3_url = st.sidebar.text_input("Enter S3 URL (e.g., s3://bucket_name/path/to/file.parquet)")
         uploaded_file = None
+        if s3_url:
+            try:
+                split_s3_url(s3_url)
+            except ValueError as error:
+                st.error(str(error))
+                s3_url = None
+
+    # Float columns are loaded as float32 unless full precision is requested, halving memory and compute
+    float32 = not st.sidebar.checkbox("Keep full float64 precision", value=False)
 
     if uploaded_file or s3_url:
-        data = data_loader.load_data(file_path=uploaded_file, s3_url=s3_url)
-        if data is not None:
+        # Only the parquet schema is read here; the columns are loaded once they are selected
+        columns = data_loader.read_columns(file_path=uploaded_file, s3_url=s3_url)
+        if columns is not None:
             st.sidebar.header("Metadata Analysis")
-            metadata_field = st.sidebar.selectbox("Select metadata field", data.columns)
+            metadata_field = st.sidebar.selectbox("Select metadata field", columns)
             st.sidebar.header("Preprocessing Options")
             preprocessing_option = st.sidebar.selectbox("Choose preprocessing method", ["None", "Derivative", "Z-Score", "Smoothing", "Band-Pass Filter"])
 
             # Adjust settings based on preprocessing method
             if preprocessing_option == 'Smoothing':
                 window_size = st.sidebar.slider("Smoothing window size", min_value=1, max_value=50, value=5)
-                preprocessed_data, preprocessing_label = data_processor.preprocess_data(data, preprocessing_option, window=window_size)
+                preprocessing_params = {'window': window_size}
             elif preprocessing_option == 'Band-Pass Filter':
                 sampling_frequency = st.sidebar.number_input("Sampling Frequency for Band-Pass (Hz)", value=100, min_value=1)
                 lowcut = st.sidebar.number_input("Low Cutoff Frequency (Hz)", value=0.5, min_value=0.1, max_value=100.0, step=0.1)
                 highcut = st.sidebar.number_input("High Cutoff Frequency (Hz)", value=30.0, min_value=0.1, max_value=100.0, step=0.1)
-                preprocessed_data, preprocessing_label = data_processor.preprocess_data(data, preprocessing_option, sampling_frequency, lowcut=lowcut, highcut=highcut)
+                preprocessing_params = {'sampling_frequency': sampling_frequency, 'lowcut': lowcut, 'highcut': highcut}
             else:
-                preprocessed_data, preprocessing_label = data_processor.preprocess_data(data, preprocessing_option)
+                preprocessing_params = {}
 
             st.header(f"Metadata Analysis: {metadata_field}")
-            st.write(data[metadata_field].describe())
+            data = data_loader.load_data(file_path=uploaded_file, s3_url=s3_url, float32=float32, columns=[metadata_field])
+            st.write(fast_describe(data[metadata_field]))
             st.write("Statistical Plots")
-            fig, ax = plt.subplots()
-            sns.histplot(data[metadata_field], kde=True, ax=ax)
-            st.pyplot(fig)
+            field = data[metadata_field].dropna()
+            fig = go.Figure()
+            if not pd.api.types.is_numeric_dtype(field) or pd.api.types.is_bool_dtype(field):
+                # Labels, flags and timestamps are counted by Plotly
+                fig.add_trace(go.Histogram(x=field, name="Count"))
+            else:
+                values = field.to_numpy(dtype=np.float64)
+                values = values[np.isfinite(values)]
+                if len(values):
+                    counts, edges = np.histogram(values, bins='auto')
+                    fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name="Count"))
+                    # Density estimate fitted on a bounded subsample and scaled to the histogram counts
+                    sample = values if len(values) <= 10000 else np.random.default_rng(0).choice(values, 10000, replace=False)
+                    if np.ptp(sample) > 0:
+                        grid = np.linspace(edges[0], edges[-1], 256)
+                        density = gaussian_kde(sample)(grid) * len(values) * (edges[1] - edges[0])
+                        fig.add_trace(go.Scatter(x=grid, y=density, mode='lines', name="KDE"))
+            fig.update_layout(xaxis_title=metadata_field, yaxis_title="Count", bargap=0)
+            st.plotly_chart(fig)
 
             # Visualization of Single Drive Files
             st.sidebar.header("Single Drive Visualization")
-            selected_signals = st.sidebar.multiselect("Select signals to display", data.columns)
+            selected_signals = st.sidebar.multiselect("Select signals to display", columns)
             subplot_option = st.sidebar.checkbox("Use subplots for each signal", value=True)
             sampling_frequency_single = st.sidebar.number_input("Sampling Frequency for Single Drive (Hz)", value=100, min_value=1)
             
             if selected_signals:
                 st.header("Single Drive File Visualization")
-                time_vector = np.arange(len(preprocessed_data)) / sampling_frequency_single  # Calculate time vector
-                fig, axes = plt.subplots(len(selected_signals), 1, sharex=True if subplot_option else False)
-                if len(selected_signals) == 1:
-                    axes = [axes]
+                signal_data = data_loader.load_data(file_path=uploaded_file, s3_url=s3_url, float32=float32, columns=selected_signals)
+                if preprocessing_option == 'None':
+                    # Nothing to apply: skip the cached call and its copy of the data
+                    preprocessed_data, preprocessing_label = signal_data, 'None'
+                else:
+                    preprocessed_data, preprocessing_label = data_processor.preprocess_data(signal_data, preprocessing_option, **preprocessing_params)
+                time_values = time_vector(len(preprocessed_data), sampling_frequency_single)  # Calculate time vector
+                fig = make_subplots(rows=len(selected_signals), cols=1, shared_xaxes=subplot_option)
 
                 for i, signal in enumerate(selected_signals):
-                    axes[i].plot(time_vector, preprocessed_data[signal].values, label=signal)
+                    # Decimate long signals so rendering cost stays bounded
+                    x, y = downsample(time_values, preprocessed_data[signal].to_numpy(copy=False))
+                    fig.add_trace(go.Scattergl(x=x, y=y, mode='lines', name=signal), row=i + 1, col=1)
                     y_axis_label = signal if preprocessing_label == 'None' else f'{signal} ({preprocessing_label})'
-                    axes[i].set_xlabel(f'Time (Frequency: {sampling_frequency_single} Hz)')
-                    axes[i].set_ylabel(y_axis_label)
-                    axes[i].legend()
+                    fig.update_xaxes(title_text=f'Time (Frequency: {sampling_frequency_single} Hz)', row=i + 1, col=1)
+                    fig.update_yaxes(title_text=y_axis_label, row=i + 1, col=1)
 
-                st.pyplot(fig)
+                fig.update_layout(height=300 * len(selected_signals))
+                st.plotly_chart(fig)
             
             # Data Reconstruction: Path Plotting
             st.sidebar.header("Data Reconstruction")
-            if 'wheel_angle' in data.columns and 'speed' in data.columns:
+            if 'wheel_angle' in columns and 'speed' in columns:
                 st.sidebar.subheader("Conversion Ratio")
                 conversion_ratio = st.sidebar.slider("Conversion Ratio", min_value=0.1, max_value=10.0, value=1.0, step=0.1)
 
                 if st.sidebar.button("Reconstruct Path"):
                     st.header("Reconstructed Path of the Car")
-                    x_path, y_path = path_reconstructor.calculate_path(data['wheel_angle'] * conversion_ratio, data['speed'], sampling_frequency_single)
+                    data = data_loader.load_data(file_path=uploaded_file, s3_url=s3_url, float32=float32, columns=['wheel_angle', 'speed'])
+                    wheel_angle = data['wheel_angle'].to_numpy(copy=False)
+                    speed = data['speed'].to_numpy(copy=False)
+                    x_path, y_path = path_reconstructor.calculate_path(wheel_angle * conversion_ratio, speed, sampling_frequency_single)
+                    x_path, y_path = decimate(x_path, y_path)  # Bound the number of points sent to the browser
                     
-                    fig, ax = plt.subplots()
-                    ax.plot(x_path, y_path, label=f'Path (Conversion Ratio: {conversion_ratio})')
-                    ax.set_xlabel('X Position (m)')
-                    ax.set_ylabel('Y Position (m)')
-                    ax.legend()
-                    ax.set_aspect('equal', 'box')
-                    st.pyplot(fig)
+                    fig = go.Figure(go.Scattergl(x=x_path, y=y_path, mode='lines', name=f'Path (Conversion Ratio: {conversion_ratio})',
+                                                 showlegend=True))
+                    fig.update_layout(xaxis_title='X Position (m)', yaxis_title='Y Position (m)')
+                    fig.update_yaxes(scaleanchor='x', scaleratio=1)  # Equal aspect ratio
+                    st.plotly_chart(fig)
             else:
                 st.sidebar.warning("Data must contain 'wheel_angle' and 'speed' columns for path reconstruction.")
 
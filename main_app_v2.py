@@ -4,11 +4,50 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import os
-from utils import DataLoader, DataProcessor, PathReconstructor
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils import DataLoader, DataProcessor, PathReconstructor, array_digest, decimate, downsample, fast_describe, histogram, histogram2d, split_s3_url, time_vector, upload_digest, S3_CACHE_TTL
+
+# Path to the logo image in the same directory as the script
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
+
+PREPROCESSING_METHODS = ["None", "Derivative", "Z-Score", "Smoothing", "Band-Pass Filter"]
+COLOR_SEQUENCE = px.colors.qualitative.Set3  # Use a distinct color sequence
+
+# Sections decorated with fragment rerun on their own when their widgets change, instead of the whole script.
+# Fragments cannot add to the sidebar, so their widgets are placed in the main area.
+# (st.fragment needs Streamlit 1.37, st.experimental_fragment 1.33; older versions rerun the whole script)
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@st.cache_resource(show_spinner=False)
+def load_logo(path):
+    # Read the image once per server process instead of on every rerun
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={np.ndarray: array_digest})
+def reconstruct_path(wheel_angle, speed, sampling_frequency, wheel_base, degrees=False):
+    # Paths are deterministic in their inputs, so repeated reconstructions are served from the cache
+    return PathReconstructor(wheel_base=wheel_base).calculate_path(wheel_angle, speed, sampling_frequency, degrees)
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={np.ndarray: array_digest})
+def similarity_matrix(paths):
+    # Keyed on the contents of the paths, so showing the same reconstruction again skips the pairwise comparison
+    return PathReconstructor().calculate_similarity_matrix(paths)
+
+@st.cache_data(show_spinner=False)
+def describe_field(dataset_id, field, dtype, _values):
+    # A summary only depends on the file, the column and its loaded dtype, so it is computed once per combination
+    return fast_describe(_values)
 
 def slider_with_input_sidebar(label, min_value, max_value, value, step, key):
-    # Create a two-column layout within the sidebar
-    col1, col2 = st.sidebar.columns([3, 1])
+    return slider_with_input(st.sidebar, label, min_value, max_value, value, step, key)
+
+def slider_with_input(container, label, min_value, max_value, value, step, key):
+    # Create a two-column layout within the container (the sidebar, or the main area inside fragments)
+    col1, col2 = container.columns([3, 1])
 
     # Slider in the first column
     slider_value = col1.slider(label, min_value=min_value, max_value=max_value, value=value, step=step, key=f"{key}_slider")
@@ -22,24 +61,310 @@ def slider_with_input_sidebar(label, min_value, max_value, value, step, key):
 
     return slider_value
 
-def main():
-    # Get the directory where the script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Construct the path to the logo image in the same directory as the script
-    logo_path = os.path.join(script_dir, "logo.png")
-    
+def thread_pool(max_workers):
+    # Worker threads inherit the script run context so cached calls behave as on the main thread
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx()))
+
+def parallel_map(func, items):
+    # Per-file work is mostly NumPy/SciPy code that releases the GIL, so files are processed concurrently;
+    # the Streamlit elements are still created by the caller on the main thread
+    items = list(items)
+    if len(items) < 2:
+        return [func(item) for item in items]
+    with thread_pool(min(os.cpu_count() or 1, len(items))) as executor:
+        return list(executor.map(func, items))
+
+def is_binnable(values):
+    # Numeric fields other than flags can be binned on the server; labels, flags and timestamps are left to Plotly
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+def histogram_trace(values, num_bins, value_range=None, **kwargs):
+    # Numeric fields are binned server-side, so only the bar heights are sent to the browser
+    if not is_binnable(values):
+        return go.Histogram(x=values, nbinsx=num_bins, **kwargs)
+    counts, edges = histogram(values.to_numpy(copy=False), num_bins, value_range)
+    return go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), **kwargs)
+
+def value_range(columns):
+    # Smallest and largest finite value over the numeric columns, or None if there are none
+    low, high = np.inf, -np.inf
+    for values in columns:
+        if is_binnable(values):
+            values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[np.isfinite(values)]
+            if len(values):
+                low, high = min(low, values.min()), max(high, values.max())
+    return (low, high) if low <= high else None
+
+@st.cache_resource
+def get_processors():
+    # The helpers are stateless, so one instance of each serves every rerun and session
+    return DataLoader(), DataProcessor(), PathReconstructor(wheel_base=2.5)
+
+@st.cache_data(show_spinner=False)
+def read_file_columns(_data_loader, _sources, dataset_ids):
+    # Keyed on the dataset identifiers, so the uploads are not hashed again on every rerun.
+    # The union of the columns keeps first-seen order, so the field pickers list them in a stable order
+    file_columns = {name: _data_loader.read_columns(**source) for name, source in _sources.items()}
+    all_columns = dict.fromkeys(column for columns in file_columns.values() if columns for column in columns)
+    return file_columns, list(all_columns)
+
+def column_key(columns):
+    # Canonical form of a column selection, so every order and repetition of it shares one load_columns entry
+    return tuple(sorted(set(columns), key=str))
+
+@st.cache_resource(show_spinner=False, max_entries=32, ttl=S3_CACHE_TTL)
+def load_columns(_data_loader, _sources, dataset_ids, file_columns, columns, float32=True):
+    # Read only the requested columns of every file, loading the files concurrently.
+    # The frames are shared between reruns rather than copied on each cache hit, and are only read.
+    # Entries expire like the S3 loads, so a changed S3 object is picked up here too
+    def load(name):
+        present = [column for column in dict.fromkeys(columns) if column in file_columns[name]]
+        return _data_loader.load_data(columns=present, float32=float32, **_sources[name]) if present else pd.DataFrame()
+
+    with thread_pool(min(8, len(_sources))) as executor:
+        return dict(zip(_sources, executor.map(load, _sources)))
+
+def preprocess_signals(data_processor, data_dict, dataset_keys, persistent, steps):
+    # Pipeline results are kept per (dataset, signal, steps) in session_state, which returns the same
+    # objects on every rerun (st.cache_data hands back a fresh copy on each hit). Files in persistent are
+    # identified by their contents, so their results may also be kept in the on-disk cache
+    if all(method == 'None' for method, _ in steps):
+        # Nothing to apply: plot the loaded data as is
+        return {(name, signal): (data[signal], []) for name, data in data_dict.items() for signal in data.columns}
+
+    keys = {(name, signal): (dataset_keys[name], signal, steps) for name, data in data_dict.items() for signal in data.columns}
+    previous = st.session_state.get('preprocessed_signals', {})
+    current = {key: previous[key] for key in keys.values() if key in previous}
+
+    # Signals that are not cached yet are preprocessed together, with one pipeline run per file
+    missing = {}
+    for (name, signal), key in keys.items():
+        if key not in current:
+            missing.setdefault(name, []).append(signal)
+    results = parallel_map(lambda name: data_processor.apply_pipeline((dataset_keys[name], tuple(missing[name])),
+                                                                      data_dict[name][missing[name]], steps,
+                                                                      persist=name in persistent), missing)
+    for name, (preprocessed_data, descriptions) in zip(missing, results):
+        for signal in missing[name]:
+            current[keys[(name, signal)]] = (preprocessed_data[signal], descriptions)
+
+    # Only the current signals and steps are kept, so results of stale pipelines are evicted
+    st.session_state.preprocessed_signals = current
+    return {item: current[key] for item, key in keys.items()}
+
+def pipeline_steps(preprocessing_steps):
+    # Convert the session's preprocessing steps into a hashable tuple of preprocess_data arguments
+    steps = []
+    for step in preprocessing_steps:
+        method = step['method']
+        params = step.get('params', {})
+        if method == "Smoothing":
+            steps.append((method, (('window', params['window_size']),)))
+        elif method == "Band-Pass Filter":
+            steps.append((method, (('sampling_frequency', params['sampling_frequency']),
+                                   ('lowcut', params['lowcut']),
+                                   ('highcut', params['highcut']))))
+        else:
+            steps.append((method, ()))
+    return tuple(steps)
+
+def preprocessing_step_editor():
+    # Initialize session state for storing the sequence of preprocessing methods
+    if 'preprocessing_steps' not in st.session_state:
+        st.session_state.preprocessing_steps = []
+
+    # Add button to insert new preprocessing steps
+    if st.button("Add preprocessing step"):
+        st.session_state.preprocessing_steps.append({'method': 'None'})
+
+    # Display the preprocessing steps
+    for i, step in enumerate(st.session_state.preprocessing_steps):
+        method = st.selectbox(f"Step {i+1}: Select preprocessing method", PREPROCESSING_METHODS,
+                              index=PREPROCESSING_METHODS.index(step['method']), key=f"preprocess_{i}")
+        st.session_state.preprocessing_steps[i]['method'] = method
+
+        # Collect additional parameters if required
+        if method == "Smoothing":
+            window_size = slider_with_input(st, "Smoothing window size", min_value=1, max_value=50, value=5, step=1, key=f"smoothing_{i}")
+            st.session_state.preprocessing_steps[i]['params'] = {'window_size': window_size}
+        elif method == "Band-Pass Filter":
+            sampling_frequency = st.number_input("Sampling Frequency for Band-Pass (Hz)", value=100, min_value=1, key=f"sampling_frequency_{i}")
+            lowcut = slider_with_input(st, "Low Cutoff Frequency (Hz)", min_value=0.1, max_value=100.0, value=0.5, step=0.01, key=f"lowcut_{i}")
+            highcut = slider_with_input(st, "High Cutoff Frequency (Hz)", min_value=0.1, max_value=100.0, value=30.0, step=0.01, key=f"highcut_{i}")
+            st.session_state.preprocessing_steps[i]['params'] = {
+                'sampling_frequency': sampling_frequency,
+                'lowcut': lowcut,
+                'highcut': highcut
+            }
+
+@fragment
+def signal_section(data_processor, load, dataset_keys, persistent, selected_signals, show_on_same_figure_signals,
+                   sampling_frequency_single):
+    st.header("Signal Visualization")
+    with st.expander("Preprocessing steps", expanded=True):
+        preprocessing_step_editor()
+
+    steps = pipeline_steps(st.session_state.preprocessing_steps)
+    data_dict = load(selected_signals)
+    time_vectors = {name: time_vector(len(data), sampling_frequency_single) for name, data in data_dict.items()}
+
+    # Preprocess each signal once per set of steps, so selecting another signal only processes that one
+    preprocessed_signals = preprocess_signals(data_processor, data_dict, dataset_keys, persistent, steps)
+    # NumPy views of the plotted columns, shared by the separate and combined figures
+    signal_arrays = {item: preprocessed_data.to_numpy(copy=False)
+                     for item, (preprocessed_data, _) in preprocessed_signals.items()}
+    # Long signals are decimated so the browser only receives a bounded number of points
+    signal_traces = dict(zip(signal_arrays, parallel_map(lambda item: downsample(time_vectors[item[0][0]], item[1]),
+                                                         signal_arrays.items())))
+
+    signal_figures = {}
+    for signal in selected_signals:
+        if show_on_same_figure_signals:
+            if signal not in signal_figures:
+                signal_figures[signal] = go.Figure()
+        else:
+            signal_figures[signal] = None
+
+        for idx, (name, data) in enumerate(data_dict.items()):
+            if signal in data.columns:
+                preprocessing_description = preprocessed_signals[(name, signal)][1]
+
+                # Construct the title with preprocessing information
+                title = f"{signal} Visualization ({name})"
+                if preprocessing_description:
+                    title += f" - Preprocessing: {' -> '.join(preprocessing_description)}"
+
+                # Plot the preprocessed data
+                if show_on_same_figure_signals:
+                    signal_figures[signal].add_trace(go.Scattergl(x=signal_traces[(name, signal)][0], y=signal_traces[(name, signal)][1], mode='lines',
+                                                                name=f'{signal} ({name})', line=dict(color=COLOR_SEQUENCE[idx % len(COLOR_SEQUENCE)])))
+                else:
+                    fig = go.Figure()
+                    fig.add_trace(go.Scattergl(x=signal_traces[(name, signal)][0], y=signal_traces[(name, signal)][1], mode='lines', name=f'{signal} ({name})'))
+                    fig.update_layout(title=title, xaxis_title="Seconds", yaxis_title=signal, height=400, width=800)
+                    st.plotly_chart(fig)
+            else:
+                st.warning(f"The file '{name}' does not contain the signal '{signal}'.")
+
+    # Display combined figures for each signal if checkbox is ticked
+    if show_on_same_figure_signals:
+        for signal, fig in signal_figures.items():
+            title = f"Combined {signal} Visualization"
+            if preprocessing_description:
+                title += f" - Preprocessing: {' -> '.join(preprocessing_description)}"
+            fig.update_layout(title=title, xaxis_title="Seconds", yaxis_title=signal, height=400, width=800)
+            st.plotly_chart(fig)
+
+def preprocess_axis(data_processor, data, field, method, axis, name):
+    # Preprocess one cross-field axis, asking for the parameters of its method in the main area
+    if method == "None":
+        return data[field], method
+    if method == "Smoothing":
+        window_size = slider_with_input(st, f"Smoothing window size for {field}", min_value=1, max_value=50, value=5, step=1, key=f"smoothing_{axis}_{name}")
+        return data_processor.preprocess_data(data[[field]], 'Smoothing', window=window_size)
+    elif method == "Band-Pass Filter":
+        sampling_frequency = st.number_input(f"Sampling Frequency for Band-Pass (Hz) for {field}", value=100, min_value=1, key=f"sampling_frequency_{axis}_{name}")
+        lowcut = slider_with_input(st, f"Low Cutoff Frequency (Hz) for {field}", min_value=0.1, max_value=100.0, value=0.5, step=0.01, key=f"lowcut_{axis}_{name}")
+        highcut = slider_with_input(st, f"High Cutoff Frequency (Hz) for {field}", min_value=0.1, max_value=100.0, value=30.0, step=0.01, key=f"highcut_{axis}_{name}")
+        return data_processor.preprocess_data(data[[field]], 'Band-Pass Filter',
+                                              sampling_frequency=sampling_frequency,
+                                              lowcut=lowcut, highcut=highcut)
+    return data_processor.preprocess_data(data[[field]], method)
+
+@fragment
+def cross_field_section(data_processor, load, field_x, field_y, max_scatter_points):
+    st.header(f"Cross-Field Visualization: {field_x} vs {field_y}")
+    col_x, col_y = st.columns(2)
+    method_x = col_x.selectbox(f"Select preprocessing for {field_x}", PREPROCESSING_METHODS, key="method_x")
+    method_y = col_y.selectbox(f"Select preprocessing for {field_y}", PREPROCESSING_METHODS, key="method_y")
+    transparency = slider_with_input(st, "Dot Transparency", min_value=0.01, max_value=1.0, value=0.8, step=0.01, key="transparency")
+
+    data_dict = load([field_x, field_y])
+    for name, data in data_dict.items():
+        if field_x in data.columns and field_y in data.columns:
+            # Unprocessed axes plot the loaded columns directly; preprocess_data returns new objects,
+            # so the columns are never modified and need no copy
+            preprocessed_x, preprocessing_description_x = preprocess_axis(data_processor, data, field_x, method_x, 'x', name)
+            preprocessed_y, preprocessing_description_y = preprocess_axis(data_processor, data, field_y, method_y, 'y', name)
+
+            # Create scatter plot with specified transparency
+            title = f"{field_x} vs {field_y} ({name})"
+            if method_x != 'None' or method_y != 'None':
+                title += f" - Preprocessing: X({preprocessing_description_x}) Y({preprocessing_description_y})"
+
+            x_values, y_values = preprocessed_x.squeeze(), preprocessed_y.squeeze()
+            if len(preprocessed_x) > max_scatter_points and is_binnable(x_values) and is_binnable(y_values):
+                # Too many points to draw one by one: show their density on a log-scaled 2D histogram instead
+                # (labels, flags and timestamps have no numeric bins, so those pairs stay a scatter plot)
+                counts, x_edges, y_edges = histogram2d(x_values.to_numpy(dtype=np.float64, na_value=np.nan),
+                                                       y_values.to_numpy(dtype=np.float64, na_value=np.nan), 256)
+                fig = go.Figure(go.Heatmap(x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+                                           z=np.log1p(counts.T), colorbar=dict(title="log(1 + count)")))
+                fig.update_layout(title=title)
+            else:
+                fig = px.scatter(x=x_values, y=y_values, title=title)
+                fig.update_traces(marker=dict(opacity=transparency))
+            fig.update_layout(height=400, width=800, xaxis_title=field_x, yaxis_title=field_y)
+            st.plotly_chart(fig)
+        else:
+            st.warning(f"The file '{name}' does not contain the fields '{field_x}' and/or '{field_y}'.")
+
+@fragment
+def reconstruction_section(path_reconstructor, load, wheel_angle_column, speed_column, sampling_frequency_single,
+                           show_on_same_figure_reconstruction, angle_unit):
+    conversion_ratio = slider_with_input(st, "Conversion Ratio", min_value=0.01, max_value=10.0, value=1.0, step=0.01, key="conversion_ratio")
+
+    if st.button("Reconstruct Path"):
+        st.header("Reconstructed Path of the Car")
+
+        combined_fig = go.Figure() if show_on_same_figure_reconstruction else None
+        data_dict = load([wheel_angle_column, speed_column])
+
+        def file_path(data):
+            # Scale the raw arrays rather than building a new Series per file
+            wheel_angle = data[wheel_angle_column].to_numpy(copy=False)
+            speed = data[speed_column].to_numpy(copy=False)
+            return reconstruct_path(wheel_angle * conversion_ratio, speed, sampling_frequency_single, path_reconstructor.wheel_base,
+                                    degrees=angle_unit == "Degrees")
+
+        # The path kernel runs without the GIL, so the files are reconstructed concurrently
+        paths = dict(zip(data_dict, parallel_map(file_path, data_dict.values())))
+
+        for idx, (name, path) in enumerate(paths.items()):
+            # The similarity matrix uses the full paths; only the plotted traces are decimated
+            x_path, y_path = decimate(*path)
+
+            if show_on_same_figure_reconstruction:
+                combined_fig.add_trace(go.Scattergl(x=x_path, y=y_path, mode='lines', name=f'Path ({name})',
+                                                  line=dict(color=COLOR_SEQUENCE[idx % len(COLOR_SEQUENCE)])))
+            else:
+                fig = go.Figure()
+                fig.add_trace(go.Scattergl(x=x_path, y=y_path, mode='lines', name=f'Path ({name})'))
+                fig.update_layout(title=f"Reconstructed Path ({name})", xaxis_title="X Position (m)", yaxis_title="Y Position (m)", height=400, width=800)
+                st.plotly_chart(fig)
+
+        # Display combined figure if checkbox is ticked
+        if show_on_same_figure_reconstruction:
+            combined_fig.update_layout(title="Combined Reconstructed Paths", xaxis_title="X Position (m)", yaxis_title="Y Position (m)", height=400, width=800)
+            st.plotly_chart(combined_fig)
+
+        # Calculate and display the similarity matrix
+        st.header("Similarity Matrix")
+        st.dataframe(similarity_matrix(paths).style.format("{:.2f}"))
+
+def main(default_angle_unit="Radians"):
+    # default_angle_unit: unit preselected for the wheel angle column ("Degrees" or "Radians")
     # Load the logo image if it exists
-    if os.path.exists(logo_path):
-        st.image(logo_path, width=150)
+    logo = load_logo(LOGO_PATH)
+    if logo is not None:
+        st.image(logo, width=150)
     else:
         st.warning("Logo image could not be found.")
     
     st.title("CorrDash: Dashboard for Data Analysis and Visualization")
 
-    data_loader = DataLoader()
-    data_processor = DataProcessor()
-    path_reconstructor = PathReconstructor(wheel_base=2.5)
+    data_loader, data_processor, path_reconstructor = get_processors()
 
     st.sidebar.header("Data Source")
     data_source = st.sidebar.selectbox("Select data source", ["Upload files", "S3 URL"])
@@ -50,230 +375,119 @@ def main():
     elif data_source == "S3 URL":
         s3_url = st.sidebar.text_input("Enter S3 URL (e.g., s3://bucket_name/path/to/file.parquet)")
         uploaded_files = []
+        if s3_url:
+            try:
+                split_s3_url(s3_url)
+            except ValueError as error:
+                st.error(str(error))
+                s3_url = None
+
+    # Float columns are loaded as float32 unless full precision is requested, halving memory and compute
+    full_precision = st.sidebar.checkbox("Keep full float64 precision", value=False, key="full_precision")
 
     if uploaded_files or s3_url:
-        data_dict = {}
-        all_columns = set()  # To hold all unique columns across all files
+        sources = {}  # load_data arguments for each file
+        dataset_ids = {}  # Stable identifiers used as preprocessing cache keys
         
         if uploaded_files:
             for uploaded_file in uploaded_files:
-                data = data_loader.load_data(file_path=uploaded_file)
-                data_dict[uploaded_file.name] = data
-                all_columns.update(data.columns)  # Add columns from this file to the set
+                sources[uploaded_file.name] = {'file_path': uploaded_file}
+                dataset_ids[uploaded_file.name] = upload_digest(uploaded_file.file_id, uploaded_file)
 
         elif s3_url:
-            data = data_loader.load_data(s3_url=s3_url)
-            data_dict[s3_url] = data
-            all_columns.update(data.columns)  # Add columns from the S3 file to the set
+            sources[s3_url] = {'s3_url': s3_url}
+            dataset_ids[s3_url] = s3_url
 
-        if data_dict:
+        # Only the parquet schemas are read here; each section loads just the columns it displays
+        file_columns, all_columns = read_file_columns(data_loader, sources, dataset_ids)  # all_columns: unique columns across all files
+
+        if file_columns:
             st.sidebar.header("Data Fields Statistical Analysis")
-            selected_fields = st.sidebar.multiselect("Select data fields", list(all_columns))  # Allow multiple field selection
+            selected_fields = st.sidebar.multiselect("Select data fields", all_columns)  # Allow multiple field selection
             show_on_same_figure = st.sidebar.checkbox("Show graphs of the same field on the same figure", key="data_fields_checkbox")
             num_bins = slider_with_input_sidebar("Number of bins", min_value=10, max_value=100, value=50, step=1, key="num_bins")
 
             st.header("Data Fields Statistical Analysis")
 
             if selected_fields:
-                color_sequence = px.colors.qualitative.Set3  # Use a distinct color sequence
+                data_dict = load_columns(data_loader, sources, dataset_ids, file_columns, column_key(selected_fields), not full_precision)
 
                 for field in selected_fields:
                     combined_fig = go.Figure() if show_on_same_figure else None
-                    statistical_summaries = []
+                    statistical_summaries = {}  # Summary of the field for each file
+
+                    # Bin every file on the same edges, so the bars line up in the combined and the separate figures
+                    field_range = value_range(data[field] for data in data_dict.values() if field in data.columns)
+
+                    def field_result(item):
+                        # Summary and binned trace of one file, computed on a worker thread
+                        idx, (name, data) = item
+                        if field not in data.columns:
+                            return None
+                        summary = describe_field(dataset_ids[name], field, str(data[field].dtype), data[field])
+                        trace = histogram_trace(data[field], num_bins, field_range, name=f"{name} - {field}",
+                                                marker_color=COLOR_SEQUENCE[idx % len(COLOR_SEQUENCE)])
+                        return summary, trace
+
+                    results = parallel_map(field_result, enumerate(data_dict.items()))
 
-                    for idx, (name, data) in enumerate(data_dict.items()):
-                        if field in data.columns:
+                    for name, result in zip(data_dict, results):
+                        if result is not None:
                             # Collect statistical summary for the field
-                            summary = data[field].describe()
-                            summary.name = f"{name}"
-                            statistical_summaries.append(summary)
+                            summary, trace = result
+                            statistical_summaries[name] = summary
 
                             # Plot using Plotly
                             if show_on_same_figure:
-                                combined_fig.add_trace(go.Histogram(x=data[field], name=f"{name} - {field}",
-                                                                    marker_color=color_sequence[idx % len(color_sequence)], nbinsx=num_bins))
+                                combined_fig.add_trace(trace)
                             else:
                                 # Separate figures for each dataset and field when the checkbox is unticked
                                 fig = go.Figure()
-                                fig.add_trace(go.Histogram(x=data[field], name=f"{name} - {field}",
-                                                           marker_color=color_sequence[idx % len(color_sequence)], nbinsx=num_bins))
-                                fig.update_layout(title=f"{field} Distribution ({name})", height=400, width=800)
+                                fig.add_trace(trace)
+                                fig.update_layout(title=f"{field} Distribution ({name})", height=400, width=800, bargap=0)
                                 st.plotly_chart(fig)
                         else:
                             st.warning(f"The file '{name}' does not contain the field '{field}'.")
 
                     # Display combined figure for the current field if checkbox is ticked
                     if show_on_same_figure and combined_fig:
-                        combined_fig.update_layout(barmode='overlay', title=f"Combined {field} Distributions", height=400, width=800)
+                        combined_fig.update_layout(barmode='overlay', title=f"Combined {field} Distributions", height=400, width=800, bargap=0)
                         combined_fig.update_traces(opacity=0.75)
                         st.plotly_chart(combined_fig)
 
                     # Display statistical summaries for the current field
                     if statistical_summaries:
                         st.subheader(f"Statistical Summaries for {field}")
-                        st.write(pd.concat(statistical_summaries, axis=1))
+                        # The files' summaries share their row labels, so they are stacked as columns without concat's alignment
+                        st.write(pd.DataFrame(statistical_summaries))
+
+            # Loads the given columns of every file, for the sections below
+            def load(columns):
+                return load_columns(data_loader, sources, dataset_ids, file_columns, column_key(columns), not full_precision)
 
             # Visualization of Signals
             st.sidebar.header("Signal Visualization")
-            selected_signals = st.sidebar.multiselect("Select signals to display", list(all_columns))  # Use all_columns here
+            selected_signals = st.sidebar.multiselect("Select signals to display", all_columns)  # Use all_columns here
             show_on_same_figure_signals = st.sidebar.checkbox("Show graphs of the same field on the same figure", key="signal_visualization_checkbox")
             sampling_frequency_single = st.sidebar.number_input("Sampling Frequency for Signal Visualization (Hz)", value=100, min_value=1)
 
-            # Initialize session state for storing the sequence of preprocessing methods
-            if 'preprocessing_steps' not in st.session_state:
-                st.session_state.preprocessing_steps = []
-
-            # Add button to insert new preprocessing steps
-            if st.sidebar.button("Add preprocessing step"):
-                st.session_state.preprocessing_steps.append({'method': 'None'})
-
-            # Display the preprocessing steps
-            for i, step in enumerate(st.session_state.preprocessing_steps):
-                method = st.sidebar.selectbox(f"Step {i+1}: Select preprocessing method", 
-                                              ["None", "Derivative", "Z-Score", "Smoothing", "Band-Pass Filter"], 
-                                              index=["None", "Derivative", "Z-Score", "Smoothing", "Band-Pass Filter"].index(step['method']),
-                                              key=f"preprocess_{i}")
-                st.session_state.preprocessing_steps[i]['method'] = method
-
-                # Collect additional parameters if required
-                if method == "Smoothing":
-                    window_size = slider_with_input_sidebar("Smoothing window size", min_value=1, max_value=50, value=5, step=1, key=f"smoothing_{i}")
-                    st.session_state.preprocessing_steps[i]['params'] = {'window_size': window_size}
-                elif method == "Band-Pass Filter":
-                    sampling_frequency = st.sidebar.number_input("Sampling Frequency for Band-Pass (Hz)", value=100, min_value=1, key=f"sampling_frequency_{i}")
-                    lowcut = slider_with_input_sidebar("Low Cutoff Frequency (Hz)", min_value=0.1, max_value=100.0, value=0.5, step=0.01, key=f"lowcut_{i}")
-                    highcut = slider_with_input_sidebar("High Cutoff Frequency (Hz)", min_value=0.1, max_value=100.0, value=30.0, step=0.01, key=f"highcut_{i}")
-                    st.session_state.preprocessing_steps[i]['params'] = {
-                        'sampling_frequency': sampling_frequency,
-                        'lowcut': lowcut,
-                        'highcut': highcut
-                    }
-
             if selected_signals:
-                st.header("Signal Visualization")
-                time_vectors = {name: np.arange(len(data)) / sampling_frequency_single for name, data in data_dict.items()}
-                
-                signal_figures = {}
-                for signal in selected_signals:
-                    if show_on_same_figure_signals:
-                        if signal not in signal_figures:
-                            signal_figures[signal] = go.Figure()
-                    else:
-                        signal_figures[signal] = None
-
-                    for idx, (name, data) in enumerate(data_dict.items()):
-                        if signal in data.columns:
-                            # Apply preprocessing methods in the specified order
-                            preprocessed_data = data.copy()
-                            preprocessing_description = []
-                            for step in st.session_state.preprocessing_steps:
-                                method = step['method']
-                                if method == "Smoothing":
-                                    params = step['params']
-                                    preprocessed_data, description = data_processor.preprocess_data(preprocessed_data, 'Smoothing', window=params['window_size'])
-                                elif method == "Band-Pass Filter":
-                                    params = step['params']
-                                    preprocessed_data, description = data_processor.preprocess_data(preprocessed_data, 'Band-Pass Filter', 
-                                                                                         sampling_frequency=params['sampling_frequency'], 
-                                                                                         lowcut=params['lowcut'], 
-                                                                                         highcut=params['highcut'])
-                                elif method != 'None':
-                                    preprocessed_data, description = data_processor.preprocess_data(preprocessed_data, method)
-                                
-                                if method != 'None':
-                                    preprocessing_description.append(description)
-
-                            # Construct the title with preprocessing information
-                            title = f"{signal} Visualization ({name})"
-                            if preprocessing_description:
-                                title += f" - Preprocessing: {' -> '.join(preprocessing_description)}"
-
-                            # Plot the preprocessed data
-                            if show_on_same_figure_signals:
-                                signal_figures[signal].add_trace(go.Scatter(x=time_vectors[name], y=preprocessed_data[signal].values, mode='lines', 
-                                                                            name=f'{signal} ({name})', line=dict(color=color_sequence[idx % len(color_sequence)])))
-                            else:
-                                fig = go.Figure()
-                                fig.add_trace(go.Scatter(x=time_vectors[name], y=preprocessed_data[signal].values, mode='lines', name=f'{signal} ({name})'))
-                                fig.update_layout(title=title, xaxis_title="Seconds", yaxis_title=signal, height=400, width=800)
-                                st.plotly_chart(fig)
-                        else:
-                            st.warning(f"The file '{name}' does not contain the signal '{signal}'.")
-
-                # Display combined figures for each signal if checkbox is ticked
-                if show_on_same_figure_signals:
-                    for signal, fig in signal_figures.items():
-                        title = f"Combined {signal} Visualization"
-                        if preprocessing_description:
-                            title += f" - Preprocessing: {' -> '.join(preprocessing_description)}"
-                        fig.update_layout(title=title, xaxis_title="Seconds", yaxis_title=signal, height=400, width=800)
-                        st.plotly_chart(fig)
+                dataset_keys = {name: (dataset_ids[name], full_precision) for name in dataset_ids}
+                # Uploads are identified by a digest of their contents, so their results can be kept on disk;
+                # an S3 object can change under the same URL
+                persistent = {name for name, source in sources.items() if 'file_path' in source}
+                signal_section(data_processor, load, dataset_keys, persistent, selected_signals, show_on_same_figure_signals,
+                               sampling_frequency_single)
 
             # Add a subsection for cross-field visualization
             st.sidebar.subheader("Cross-Field Visualization")
-            field_x = st.sidebar.selectbox("Select X-axis field", ["None"] + list(all_columns), key="field_x")
-            field_y = st.sidebar.selectbox("Select Y-axis field", ["None"] + list(all_columns), key="field_y")
-            method_x = st.sidebar.selectbox(f"Select preprocessing for {field_x if field_x != 'None' else 'X-axis'}", 
-                                            ["None", "Derivative", "Z-Score", "Smoothing", "Band-Pass Filter"],
-                                            key="method_x")
-
-            method_y = st.sidebar.selectbox(f"Select preprocessing for {field_y if field_y != 'None' else 'Y-axis'}", 
-                                            ["None", "Derivative", "Z-Score", "Smoothing", "Band-Pass Filter"],
-                                            key="method_y")
-
-            transparency = slider_with_input_sidebar("Dot Transparency", min_value=0.01, max_value=1.0, value=0.8, step=0.01, key="transparency")
-            
-            if field_x != "None" and field_y != "None":
-                st.header(f"Cross-Field Visualization: {field_x} vs {field_y}")
-                
-                for idx, (name, data) in enumerate(data_dict.items()):
-                    if field_x in data.columns and field_y in data.columns:
-                        # Apply preprocessing on X-axis
-                        preprocessed_x = data[field_x].copy()
-                        preprocessed_y = data[field_y].copy()
-                        preprocessing_description_x = method_x
-                        preprocessing_description_y = method_y
-
-                        if method_x != "None":
-                            if method_x == "Smoothing":
-                                window_size = slider_with_input_sidebar(f"Smoothing window size for {field_x}", min_value=1, max_value=50, value=5, step=1, key=f"smoothing_x_{name}")
-                                preprocessed_x, preprocessing_description_x = data_processor.preprocess_data(data[[field_x]], 'Smoothing', window=window_size)
-                            elif method_x == "Band-Pass Filter":
-                                sampling_frequency = st.sidebar.number_input(f"Sampling Frequency for Band-Pass (Hz) for {field_x}", value=100, min_value=1, key=f"sampling_frequency_x_{name}")
-                                lowcut = slider_with_input_sidebar(f"Low Cutoff Frequency (Hz) for {field_x}", min_value=0.1, max_value=100.0, value=0.5, step=0.01, key=f"lowcut_x_{name}")
-                                highcut = slider_with_input_sidebar(f"High Cutoff Frequency (Hz) for {field_x}", min_value=0.1, max_value=100.0, value=30.0, step=0.01, key=f"highcut_x_{name}")
-                                preprocessed_x, preprocessing_description_x = data_processor.preprocess_data(data[[field_x]], 'Band-Pass Filter', 
-                                                                                  sampling_frequency=sampling_frequency, 
-                                                                                  lowcut=lowcut, highcut=highcut)
-                            else:
-                                preprocessed_x, preprocessing_description_x = data_processor.preprocess_data(data[[field_x]], method_x)
-                        
-                        # Apply preprocessing on Y-axis
-                        if method_y != "None":
-                            if method_y == "Smoothing":
-                                window_size = slider_with_input_sidebar(f"Smoothing window size for {field_y}", min_value=1, max_value=50, value=5, step=1, key=f"smoothing_y_{name}")
-                                preprocessed_y, preprocessing_description_y = data_processor.preprocess_data(data[[field_y]], 'Smoothing', window=window_size)
-                            elif method_y == "Band-Pass Filter":
-                                sampling_frequency = st.sidebar.number_input(f"Sampling Frequency for Band-Pass (Hz) for {field_y}", value=100, min_value=1, key=f"sampling_frequency_y_{name}")
-                                lowcut = slider_with_input_sidebar(f"Low Cutoff Frequency (Hz) for {field_y}", min_value=0.1, max_value=100.0, value=0.5, step=0.01, key=f"lowcut_y_{name}")
-                                highcut = slider_with_input_sidebar(f"High Cutoff Frequency (Hz) for {field_y}", min_value=0.1, max_value=100.0, value=30.0, step=0.01, key=f"highcut_y_{name}")
-                                preprocessed_y, preprocessing_description_y = data_processor.preprocess_data(data[[field_y]], 'Band-Pass Filter', 
-                                                                                  sampling_frequency=sampling_frequency, 
-                                                                                  lowcut=lowcut, highcut=highcut)
-                            else:
-                                preprocessed_y, preprocessing_description_y = data_processor.preprocess_data(data[[field_y]], method_y)
-
-                        # Create scatter plot with specified transparency
-                        title = f"{field_x} vs {field_y} ({name})"
-                        if method_x != 'None' or method_y != 'None':
-                            title += f" - Preprocessing: X({preprocessing_description_x}) Y({preprocessing_description_y})"
+            field_x = st.sidebar.selectbox("Select X-axis field", ["None"] + all_columns, key="field_x")
+            field_y = st.sidebar.selectbox("Select Y-axis field", ["None"] + all_columns, key="field_y")
+            # Larger files are drawn as a density heatmap, which keeps the browser responsive
+            max_scatter_points = st.sidebar.number_input("Maximum points in a scatter plot", value=50000, min_value=1000, step=1000, key="max_scatter_points")
 
-                        fig = px.scatter(x=preprocessed_x.squeeze(), y=preprocessed_y.squeeze(), title=title)
-                        fig.update_traces(marker=dict(opacity=transparency))
-                        fig.update_layout(height=400, width=800, xaxis_title=field_x, yaxis_title=field_y)
-                        st.plotly_chart(fig)
-                    else:
-                        st.warning(f"The file '{name}' does not contain the fields '{field_x}' and/or '{field_y}'.")
+            if field_x != "None" and field_y != "None":
+                cross_field_section(data_processor, load, field_x, field_y, max_scatter_points)
 
             st.sidebar.header("Data Reconstruction")
             show_on_same_figure_reconstruction = st.sidebar.checkbox("Show all reconstructed paths on the same figure", key="reconstruction_checkbox")
@@ -282,40 +496,13 @@ def main():
             st.sidebar.subheader("Path Reconstruction Columns")
             wheel_angle_column = st.sidebar.text_input("Wheel Angle Column Name", value="wheel_angle")
             speed_column = st.sidebar.text_input("Speed Column Name", value="speed")
+            angle_units = ["Degrees", "Radians"]
+            angle_unit = st.sidebar.selectbox("Wheel Angle Unit", angle_units, index=angle_units.index(default_angle_unit), key="angle_unit")
 
             # Check if all dataframes contain the necessary columns
-            if all([wheel_angle_column in data.columns and speed_column in data.columns for data in data_dict.values()]):
-                st.sidebar.subheader("Conversion Ratio")
-                conversion_ratio = slider_with_input_sidebar("Conversion Ratio", min_value=0.01, max_value=10.0, value=1.0, step=0.01, key="conversion_ratio")
-
-                if st.sidebar.button("Reconstruct Path"):
-                    st.header("Reconstructed Path of the Car")
-
-                    combined_fig = go.Figure() if show_on_same_figure_reconstruction else None
-                    paths = {}
-
-                    for idx, (name, data) in enumerate(data_dict.items()):
-                        x_path, y_path = path_reconstructor.calculate_path(data[wheel_angle_column] * conversion_ratio, data[speed_column], sampling_frequency_single)
-                        paths[name] = (x_path, y_path)
-
-                        if show_on_same_figure_reconstruction:
-                            combined_fig.add_trace(go.Scatter(x=x_path, y=y_path, mode='lines', name=f'Path ({name})',
-                                                              line=dict(color=color_sequence[idx % len(color_sequence)])))
-                        else:
-                            fig = go.Figure()
-                            fig.add_trace(go.Scatter(x=x_path, y=y_path, mode='lines', name=f'Path ({name})'))
-                            fig.update_layout(title=f"Reconstructed Path ({name})", xaxis_title="X Position (m)", yaxis_title="Y Position (m)", height=400, width=800)
-                            st.plotly_chart(fig)
-
-                    # Display combined figure if checkbox is ticked
-                    if show_on_same_figure_reconstruction:
-                        combined_fig.update_layout(title="Combined Reconstructed Paths", xaxis_title="X Position (m)", yaxis_title="Y Position (m)", height=400, width=800)
-                        st.plotly_chart(combined_fig)
-
-                    # Calculate and display the similarity matrix
-                    st.header("Similarity Matrix")
-                    similarity_matrix = path_reconstructor.calculate_similarity_matrix(paths)
-                    st.dataframe(similarity_matrix.style.format("{:.2f}"))
+            if all([wheel_angle_column in columns and speed_column in columns for columns in file_columns.values()]):
+                reconstruction_section(path_reconstructor, load, wheel_angle_column, speed_column, sampling_frequency_single,
+                                       show_on_same_figure_reconstruction, angle_unit)
             else:
                 st.sidebar.warning(f"Data must contain '{wheel_angle_column}' and '{speed_column}' columns for path reconstruction.")
 
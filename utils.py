@@ -1,31 +1,380 @@
 # utils.py
+import functools
+import hashlib
+import json
+import math
+import os
+import threading
 import pandas as pd
 import numpy as np
-import boto3
-from sklearn.preprocessing import StandardScaler
-from scipy.signal import butter, filtfilt
+import botocore.session
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+import scipy
+from scipy.ndimage import uniform_filter1d
+from scipy.signal import butter, sosfiltfilt
 from io import BytesIO
 import streamlit as st
 
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional, the kernels then run as plain Python or have NumPy equivalents
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+try:
+    from fast_histogram import histogram1d, histogram2d as fast_histogram2d
+except ImportError:  # fast-histogram is optional, np.histogram gives the same counts
+    histogram1d = fast_histogram2d = None
+
+def _schema_columns(schema):
+    # Column names of a parquet schema, without the index columns pandas stores alongside the data
+    index_columns = (schema.pandas_metadata or {}).get('index_columns', [])
+    return [name for name in schema.names if name not in index_columns]
+
+def array_digest(values):
+    # Digest of the full array contents, for use as a cache hash function
+    # (Streamlit's default hasher only samples arrays above 500k elements)
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(str((values.dtype.str, values.shape)).encode(), digest_size=16)
+    digest.update(values)
+    return digest.hexdigest()
+
+@st.cache_data(show_spinner=False)
+def upload_digest(file_id, _uploaded_file):
+    # Content digest of an upload, computed once per upload (file_id) and used as its dataset identifier,
+    # so uploading the same file again reuses every cached result of the first upload.
+    # getvalue() shares the upload's bytes; getbuffer() would unshare them, so it and every later getvalue() would copy
+    return hashlib.blake2b(_uploaded_file.getvalue(), digest_size=16).hexdigest()
+
+def _file_digest(file):
+    # Content digest of an in-memory file: Streamlit uploads are hashed once per upload, other files on every call
+    file_id = getattr(file, 'file_id', None)
+    if file_id is None:
+        return hashlib.blake2b(file.getvalue(), digest_size=16).hexdigest()
+    return upload_digest(file_id, file)
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def time_vector(n_samples, sampling_frequency):
+    # Shared read-only array, so reruns neither recompute nor copy it
+    return np.arange(n_samples) / sampling_frequency
+
+def fast_describe(series):
+    """
+    Summary statistics of a column, labelled like pandas' Series.describe().
+
+    Numeric columns are summarized with one percentile call (a single
+    partition of the data) and two reductions; other columns fall back to
+    Series.describe().
+
+    :param series: Column to summarize.
+    :return: summary: Series with count, mean, std, min, 25%, 50%, 75% and max.
+    """
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.describe()
+
+    values = series.to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values)]
+    statistics = [np.nan] * 7
+    if len(values):
+        minimum, q25, q50, q75, maximum = np.percentile(values, [0, 25, 50, 75, 100])
+        std = values.std(ddof=1) if len(values) > 1 else np.nan
+        statistics = [values.mean(), std, minimum, q25, q50, q75, maximum]
+
+    return pd.Series([float(len(values))] + statistics, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                     name=series.name)
+
+def histogram(values, bins, value_range=None):
+    """
+    Count the finite values of an array into equal-width bins.
+
+    :param values: Array of numeric values.
+    :param bins: Number of bins.
+    :param value_range: Tuple of (min, max) covered by the bins, defaults to the range of the values.
+    :return: counts, edges: Arrays of bin counts and the bins+1 bin edges.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if value_range is None and not len(values):
+        value_range = (0, 1)
+    edges = np.histogram_bin_edges(values, bins=bins, range=value_range)
+
+    if histogram1d is not None:
+        counts = histogram1d(values, bins=bins, range=(edges[0], edges[-1]))
+        # fast-histogram leaves out values on the upper edge, which np.histogram counts in the last bin
+        counts[-1] += np.count_nonzero(values == edges[-1])
+    else:
+        counts, _ = np.histogram(values, bins=edges)
+    return counts, edges
+
+def histogram2d(x, y, bins, value_range=None):
+    """
+    Count the pairs of finite values of two arrays into a grid of equal-width bins.
+
+    :param x: Array of numeric x values.
+    :param y: Array of numeric y values, paired with x.
+    :param bins: Number of bins along each axis.
+    :param value_range: Tuple of ((xmin, xmax), (ymin, ymax)) covered by the bins, defaults to the range of the values.
+    :return: counts, x_edges, y_edges: Array of bin counts indexed [x bin, y bin] and the bin edges of each axis.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    if value_range is None:
+        value_range = (None, None) if len(x) else ((0, 1), (0, 1))
+    x_edges = np.histogram_bin_edges(x, bins=bins, range=value_range[0])
+    y_edges = np.histogram_bin_edges(y, bins=bins, range=value_range[1])
+
+    if fast_histogram2d is not None:
+        # fast-histogram leaves out values on the upper edges, so they are widened by one ulp to count them in the last bins
+        counts = fast_histogram2d(x, y, bins=bins, range=[(x_edges[0], np.nextafter(x_edges[-1], np.inf)),
+                                                          (y_edges[0], np.nextafter(y_edges[-1], np.inf))])
+    else:
+        counts, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges])
+    return counts, x_edges, y_edges
+
+def downsample(x, y, max_points=5000):
+    """
+    Reduce a trace to at most max_points points before plotting it.
+
+    The samples are split into equal buckets and the minimum and maximum of
+    each bucket are kept, so peaks remain visible at any zoom level.
+
+    :param x: Array of x values (e.g. time).
+    :param y: Array of y values.
+    :param max_points: Maximum number of points to return.
+    :return: x, y: The downsampled arrays (the inputs themselves if already short enough).
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+
+    x, y = np.asarray(x), np.asarray(y)
+    n_buckets = (max_points - 2) // 2  # Leaves room for the leftover bucket
+    bucket_size = n // n_buckets
+    buckets = y[:n_buckets * bucket_size].reshape(n_buckets, bucket_size)
+    offsets = np.arange(n_buckets) * bucket_size
+    idx = [offsets + buckets.argmin(axis=1), offsets + buckets.argmax(axis=1)]
+
+    # Samples left over after the last full bucket form one more bucket
+    tail = y[n_buckets * bucket_size:]
+    if len(tail):
+        idx.append(n_buckets * bucket_size + np.array([tail.argmin(), tail.argmax()]))
+
+    idx = np.unique(np.concatenate(idx))
+    return x[idx], y[idx]
+
+def decimate(x, y, max_points=5000):
+    """
+    Reduce a curve to at most max_points points by keeping every k-th point.
+
+    Unlike downsample, x is not assumed to be monotonic, so this suits
+    parametric curves such as reconstructed paths. The end point is always kept.
+
+    :param x: Array of x values.
+    :param y: Array of y values.
+    :param max_points: Maximum number of points to return.
+    :return: x, y: The decimated arrays (the inputs themselves if already short enough).
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+
+    idx = np.linspace(0, n - 1, max_points).astype(np.intp)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+def _read_parquet(source, columns=None, float32=False, **kwargs):
+    return _to_pandas(pq.read_table(source, columns=columns, use_pandas_metadata=True, **kwargs), float32)
+
+def _to_pandas(table, float32=False):
+    if float32:
+        # Downcast float64 columns while still in Arrow, so the pandas frame is built at half the size
+        table = table.cast(pa.schema([field.with_type(pa.float32()) if pa.types.is_float64(field.type) else field
+                                      for field in table.schema], metadata=table.schema.metadata))
+    # Convert column by column, releasing the Arrow buffers as they are copied to avoid a 2x memory peak
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+# Pre-buffering tuned for object storage (about 100 ms to first byte and 50 MiB/s per connection):
+# column chunks less than a few MiB apart are fetched in one request, and all requests are issued up front
+# so their latencies overlap instead of adding up
+_S3_SCAN_OPTIONS = ds.ParquetFragmentScanOptions(pre_buffer=True, cache_options=pa.CacheOptions.from_network_metrics(100, 50))
+
+def split_s3_url(s3_url):
+    # Bucket and key of an S3 URL, given as s3://bucket/key or bucket/key. Any other scheme is rejected, so the
+    # S3 URL input can only ever reach S3, never the server's own files or another filesystem
+    if '://' in s3_url:
+        scheme, s3_path = s3_url.split('://', 1)
+        if scheme.lower() != 's3':
+            raise ValueError(f"Only S3 URLs are supported (s3://bucket_name/path/to/file.parquet), got '{s3_url}'")
+    else:
+        s3_path = s3_url
+    bucket, _, key = s3_path.partition('/')
+    if not bucket or not key:
+        raise ValueError(f"Invalid S3 URL '{s3_url}', expected s3://bucket_name/path/to/file.parquet")
+    return bucket, key
+
+@st.cache_resource(show_spinner=False)
+def _bucket_filesystem(bucket):
+    # One filesystem per bucket, so every file in it shares the credential lookup and the connection pool.
+    # Region and endpoint come from the AWS configuration as boto3 reads them (AWS_REGION/AWS_DEFAULT_REGION,
+    # AWS_ENDPOINT_URL_S3/AWS_ENDPOINT_URL or the profile), so S3-compatible stores keep working; only when
+    # neither is configured is the bucket's region looked up, at the cost of one extra request to AWS
+    config = botocore.session.get_session()
+    options = {}
+    region = os.environ.get('AWS_REGION') or config.get_config_variable('region')
+    endpoint = (os.environ.get('AWS_ENDPOINT_URL_S3') or os.environ.get('AWS_ENDPOINT_URL')
+                or config.get_config_variable('endpoint_url'))
+    if endpoint:
+        options['endpoint_override'] = endpoint
+    if region:
+        options['region'] = region
+    elif not endpoint:
+        options['region'] = fs.resolve_s3_region(bucket)
+    return fs.S3FileSystem(**options)
+
+# S3 objects can change under the same URL, so everything read from S3 is cached for at most this many seconds
+S3_CACHE_TTL = 600
+
+@st.cache_resource(show_spinner=False, max_entries=32, ttl=S3_CACHE_TTL)
+def _s3_dataset(s3_url):
+    # The dataset keeps the filesystem and the file metadata, so every column selection of the same URL reuses them
+    bucket, key = split_s3_url(s3_url)
+    return ds.dataset(f"{bucket}/{key}", filesystem=_bucket_filesystem(bucket), format='parquet')
+
 class DataLoader:
     def __init__(self):
-        # Initialize the S3 client using default credentials from the environment
-        self.s3 = boto3.client('s3')
+        # Initialize any attributes if necessary
+        pass
     
-    @st.cache_data
-    def load_data(_self, file_path=None, s3_url=None):
+    def read_columns(self, file_path=None, s3_url=None):
+        # Only the parquet footer is read, so column pickers can be filled before any data is loaded
         if file_path:
-            return pd.read_parquet(file_path)
+            if hasattr(file_path, 'getvalue'):
+                return self.read_columns_from_bytes(_file_digest(file_path), file_path.getvalue())
+            return _schema_columns(pq.read_schema(file_path))
         elif s3_url:
-            return _self.load_data_from_s3(s3_url)
+            return self.read_columns_from_s3(s3_url)
         return None
 
-    @st.cache_data
-    def load_data_from_s3(_self, s3_url):
-        # Split the S3 URL into bucket and key
-        s3_bucket, s3_key = s3_url.replace("s3://", "").split("/", 1)
-        response = _self.s3.get_object(Bucket=s3_bucket, Key=s3_key)
-        return pd.read_parquet(BytesIO(response['Body'].read()))
+    def load_data(self, file_path=None, s3_url=None, columns=None, float32=False):
+        # Pass columns to read only those columns from the parquet file,
+        # and float32 to load float64 columns at single precision.
+        # The columns are put in a canonical order, so every order and repetition of the same selection shares
+        # one cache entry (the frame's columns come back in that order)
+        if columns is not None:
+            columns = sorted(set(columns), key=str)
+        if file_path:
+            if hasattr(file_path, 'getvalue'):
+                # Key uploads on their content digest so every rerun reuses the parsed frame without hashing the bytes
+                return self.load_data_from_bytes(_file_digest(file_path), file_path.getvalue(), columns, float32)
+            return _read_parquet(file_path, columns, float32)
+        elif s3_url:
+            return self.load_data_from_s3(s3_url, columns, float32)
+        return None
+
+    @st.cache_data(show_spinner=False)
+    def read_columns_from_bytes(_self, digest, _file_bytes):
+        return _schema_columns(pq.read_schema(BytesIO(_file_bytes)))
+
+    # The loaded frames are cached with st.cache_resource and shared by every caller instead of being
+    # unpickled into a fresh copy on each hit; callers must not modify them in place (under pandas'
+    # copy-on-write, column assignments already copy). The number of frames and their lifetime are bounded,
+    # as every column selection of every upload would otherwise stay in memory for the life of the server
+    @st.cache_resource(show_spinner=False, max_entries=32, ttl=3600)
+    def load_data_from_bytes(_self, digest, _file_bytes, columns=None, float32=False):
+        return _read_parquet(BytesIO(_file_bytes), columns, float32)
+
+    @st.cache_data(show_spinner=False, max_entries=32, ttl=S3_CACHE_TTL)
+    def read_columns_from_s3(_self, s3_url):
+        return _schema_columns(_s3_dataset(s3_url).schema)
+
+    @st.cache_resource(show_spinner=False, max_entries=32, ttl=S3_CACHE_TTL)
+    def load_data_from_s3(_self, s3_url, columns=None, float32=False):
+        dataset = _s3_dataset(s3_url)
+        if columns is not None:
+            # Also read the stored index columns, as pq.read_table does with use_pandas_metadata
+            index_columns = (dataset.schema.pandas_metadata or {}).get('index_columns', [])
+            columns = columns + [column for column in index_columns if isinstance(column, str) and column not in columns]
+        # Row groups (and the files of a multi-file prefix) are decoded on Arrow's thread pool as their ranges arrive
+        return _to_pandas(dataset.to_table(columns=columns, fragment_scan_options=_S3_SCAN_OPTIONS, use_threads=True), float32)
+
+# Size of the column blocks the band-pass filter works on
+_FILTER_BLOCK_BYTES = 32 * 2**20
+
+@functools.lru_cache(maxsize=32)
+def _band_pass_sos(sampling_frequency, lowcut, highcut):
+    # The filter design only depends on these three values, so each combination is designed once
+    nyquist = 0.5 * sampling_frequency
+    low = lowcut / nyquist
+    high = highcut / nyquist
+    # Second-order sections are faster and numerically stable at this order, unlike (b, a) coefficients.
+    # The returned array is shared between calls; sosfiltfilt only reads it
+    return butter(4, [low, high], btype='band', output='sos')
+
+# On-disk cache of pipeline results, shared across sessions and server restarts. The least recently used
+# results are removed once the files exceed the size limit
+_PIPELINE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'corrdash', 'preprocessing')
+_PIPELINE_CACHE_BYTES = 4 * 2**30
+
+@functools.lru_cache(maxsize=None)
+def _code_version():
+    # Digest of this module's source and of the numerical libraries, part of every on-disk cache key,
+    # so results computed by an older version of the preprocessing are never served
+    with open(__file__, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16)
+    digest.update(f"{np.__version__} {scipy.__version__}".encode())
+    return digest.hexdigest()
+
+def _pipeline_cache_path(dataset_id, steps):
+    key = hashlib.blake2b(repr((_code_version(), dataset_id, steps)).encode(), digest_size=16).hexdigest()
+    return os.path.join(_PIPELINE_CACHE_DIR, f"{key}.parquet")
+
+def _read_pipeline_cache(path):
+    # Cached (preprocessed_data, descriptions), or None if the result is not on disk
+    try:
+        table = pq.read_table(path)
+        os.utime(path)  # Mark as recently used
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return table.to_pandas(), json.loads(table.schema.metadata[b'descriptions'])
+
+def _write_pipeline_cache(path, data, descriptions):
+    # Results are stored as parquet, which reloads without unpickling. The cache is best effort:
+    # a read-only or full disk only means the result is computed again next time
+    table = pa.Table.from_pandas(data)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'descriptions': json.dumps(descriptions).encode()})
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(_PIPELINE_CACHE_DIR, exist_ok=True)
+        pq.write_table(table, temporary_path)
+        os.replace(temporary_path, path)  # Other sessions only ever see complete files
+        _prune_pipeline_cache()
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+def _prune_pipeline_cache():
+    # Remove the least recently used results until the cache fits in _PIPELINE_CACHE_BYTES
+    entries = []
+    for entry in os.scandir(_PIPELINE_CACHE_DIR):
+        if entry.name.endswith('.parquet'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= _PIPELINE_CACHE_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # Already removed by another session
+            pass
+        total -= size
 
 class DataProcessor:
     def __init__(self):
@@ -35,62 +384,211 @@ class DataProcessor:
     @st.cache_data
     def preprocess_data(_self, data, method, sampling_frequency=None, window=None, lowcut=None, highcut=None):
         if method == 'Derivative':
-            return data.diff().fillna(0), 'Derivative'
+            values = data.to_numpy()
+            if values.dtype.kind != 'f':
+                values = values.astype(np.float64)  # Differences of integer columns are floats, as with DataFrame.diff
+            # Prepending the first sample makes the first difference 0 directly, instead of filling a NaN row
+            derivative = np.diff(values, axis=0, prepend=values[:1])
+            np.copyto(derivative, 0, where=np.isnan(derivative))  # Gaps become 0, as fillna(0) did
+            return pd.DataFrame(derivative, columns=data.columns, index=data.index, copy=False), 'Derivative'
         elif method == 'Z-Score':
-            scaler = StandardScaler()
-            return pd.DataFrame(scaler.fit_transform(data), columns=data.columns), 'Z-Score'
+            # Standardize all columns at once along the time axis
+            values = data.to_numpy()
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0)
+            std[std == 0] = 1  # Constant columns are only centered, as StandardScaler does
+            # Center into one new array and scale it in place, instead of allocating a temporary per operation
+            standardized = np.subtract(values, mean)
+            standardized /= std
+            # The result is a new array, so the frame wraps it without pandas' defensive copy (as in the branches below)
+            return pd.DataFrame(standardized, columns=data.columns, index=data.index, copy=False), 'Z-Score'
         elif method == 'Smoothing':
-            return data.rolling(window=window).mean().fillna(method='bfill'), f'Smoothing (Window: {window})'
+            values = data.to_numpy()
+            if values.dtype.kind != 'f':
+                values = values.astype(np.float64)  # uniform_filter1d keeps integer dtypes, which would truncate the means
+            if window > len(values) or not np.isfinite(values).all():
+                # A running sum would spread gaps over the rest of the signal, so keep pandas' rolling mean here
+                return data.rolling(window=window).mean().bfill(), f'Smoothing (Window: {window})'
+            # Trailing moving average as computed by rolling().mean(), the origin shift ending each window on its sample
+            smoothed = uniform_filter1d(values, size=window, axis=0, mode='nearest', origin=(window - 1) // 2)
+            smoothed[:window - 1] = smoothed[window - 1]  # Samples before the first full window take its mean, as bfill did
+            return pd.DataFrame(smoothed, columns=data.columns, index=data.index, copy=False), f'Smoothing (Window: {window})'
         elif method == 'Band-Pass Filter':
-            nyquist = 0.5 * sampling_frequency
-            low = lowcut / nyquist
-            high = highcut / nyquist
-            b, a = butter(4, [low, high], btype='band')
-            return pd.DataFrame(filtfilt(b, a, data, axis=0), columns=data.columns), f'Band-Pass Filter ({lowcut}-{highcut} Hz)'
+            sos = _band_pass_sos(sampling_frequency, lowcut, highcut)
+            values = data.to_numpy()
+            # sosfiltfilt works on padded copies of its whole input, about twice the input size on top of the result.
+            # Filtering a block of columns at a time bounds those temporaries to the block; each column is filtered
+            # independently, so the result is the same
+            filtered = np.empty(values.shape, order='F')
+            block = max(1, _FILTER_BLOCK_BYTES // max(1, len(values) * filtered.itemsize))
+            for start in range(0, values.shape[1], block):
+                filtered[:, start:start + block] = sosfiltfilt(sos, values[:, start:start + block], axis=0)
+            return pd.DataFrame(filtered, columns=data.columns, index=data.index, copy=False), f'Band-Pass Filter ({lowcut}-{highcut} Hz)'
         return data, 'None'
 
+    @st.cache_data(show_spinner=False, max_entries=64)
+    def apply_pipeline(_self, dataset_id, _data, steps, persist=False):
+        """
+        Apply a sequence of preprocessing steps to a dataset.
+
+        The result is cached on the dataset identifier and the steps, so the
+        data itself is never hashed. With persist, the result is also kept in
+        an on-disk cache that survives server restarts; only pass it when the
+        identifier is derived from the data's contents (e.g. an upload digest),
+        as the cached result would otherwise outlive changes to the data.
+
+        :param dataset_id: Stable identifier of the dataset (e.g. upload file id or S3 URL).
+        :param _data: DataFrame to preprocess.
+        :param steps: Tuple of (method, params) pairs, params being a tuple of (keyword, value) items.
+        :param persist: Whether to also use the on-disk cache.
+        :return: preprocessed_data, descriptions: The processed DataFrame and the labels of the applied steps.
+        """
+        path = _pipeline_cache_path(dataset_id, steps) if persist else None
+        if path:
+            cached = _read_pipeline_cache(path)
+            if cached is not None:
+                return cached
+
+        # Every step returns a new frame, so the input itself never needs copying
+        preprocessed_data = _data
+        descriptions = []
+        for method, params in steps:
+            if method == 'None':
+                continue
+            preprocessed_data, description = _self.preprocess_data(preprocessed_data, method, **dict(params))
+            descriptions.append(description)
+
+        if path and descriptions:
+            _write_pipeline_cache(path, preprocessed_data, descriptions)
+        return preprocessed_data, descriptions
+
+def _kernel_input(values, dtype=np.float64):
+    # Contiguous, read-only view of an array in the given dtype. numba compiles a kernel once per input layout,
+    # dtype and writability, and columns from pandas/Arrow are often strided, float32 or read-only; passing every
+    # input in one fixed form keeps each kernel at a single compiled signature
+    values = np.ascontiguousarray(values, dtype=dtype).view()
+    values.flags.writeable = False
+    return values
+
+@njit(cache=True, fastmath={'reassoc', 'contract', 'nsz', 'arcp', 'afn'}, nogil=True)
+def _integrate_path(wheel_angle, speed, dt, wheel_base):
+    # Bicycle-model integration loop of PathReconstructor.calculate_path, compiled to machine code
+    # without the GIL, so several files can be reconstructed on threads at once. The position and heading
+    # are accumulated in float64, and only the stored path is float32
+    n = min(len(wheel_angle), len(speed))
+    x_path = np.empty(n + 1, dtype=np.float32)
+    y_path = np.empty(n + 1, dtype=np.float32)
+    x, y, theta = 0.0, 0.0, 0.0
+    x_path[0], y_path[0] = x, y
+
+    for i in range(n):
+        angle, spd = wheel_angle[i], speed[i]
+        # spd * dt * tan(angle) / wheel_base equals spd * dt / R with R = wheel_base / tan(angle), and is zero when
+        # driving straight, so that case needs no branch. Standstill samples are masked out rather than multiplied
+        # by zero: a missing (NaN) steering angle while parked must not turn the rest of the path into NaN.
+        # (NaN handling is why the fast-math flags exclude nnan/ninf, which would let LLVM drop the mask)
+        theta += spd * dt * math.tan(angle) / wheel_base if spd != 0 else 0.0
+        x += spd * math.cos(theta) * dt
+        y += spd * math.sin(theta) * dt
+
+        x_path[i + 1] = x
+        y_path[i + 1] = y
+
+    return x_path, y_path
+
+def _integrate_path_numpy(wheel_angle, speed, dt, wheel_base):
+    # Vectorized form of _integrate_path for when numba is not installed (see there for the heading update)
+    n = min(len(wheel_angle), len(speed))
+    wheel_angle, speed = wheel_angle[:n], speed[:n]
+    theta = np.cumsum(np.where(speed != 0, speed * dt * np.tan(wheel_angle) / wheel_base, 0))
+    x_path = np.zeros(n + 1, dtype=np.float32)
+    y_path = np.zeros(n + 1, dtype=np.float32)
+    x_path[1:] = np.cumsum(speed * np.cos(theta) * dt)
+    y_path[1:] = np.cumsum(speed * np.sin(theta) * dt)
+    return x_path, y_path
+
+# Only the fast-math flags that keep NaN handling are enabled, as the rows of a path with zero extent are NaN.
+# The kernel is serial: Streamlit runs every session's script on its own thread, and numba's parallel threading
+# layers either abort on concurrent launches or hang at shutdown when launched off the main thread; releasing
+# the GIL lets concurrent sessions run it in parallel instead
+@njit(cache=True, fastmath={'reassoc', 'contract', 'nsz', 'arcp'}, nogil=True, error_model='numpy')
+def _similarity_kernel(x, y, max_distance):
+    # Pairwise similarities of the resampled float32 paths in the rows of x and y. Each pair i <= j is computed
+    # once, in a single pass without temporaries, and written to both halves of the matrix; the distances are
+    # summed in float64
+    n, length = x.shape
+    similarity_matrix = np.zeros((n, n))
+    for i in range(n):
+        if max_distance[i] == 0:
+            # A path that never moves has no extent to normalize by: its similarities are undefined (NaN),
+            # as the per-sample 0 / 0 made them in calculate_similarity
+            for j in range(i, n):
+                similarity_matrix[i, j] = np.nan
+                similarity_matrix[j, i] = np.nan
+            continue
+        for j in range(i, n):
+            total = 0.0
+            for k in range(length):
+                dx = x[j, k] - x[i, k]
+                dy = y[j, k] - y[i, k]
+                total += math.sqrt(dx * dx + dy * dy)
+            value = total / length / max_distance[i]
+            if value < 0.0:
+                value = 0.0
+            elif value > 1.0:
+                value = 1.0
+            similarity_matrix[i, j] = 1 - value
+            similarity_matrix[j, i] = 1 - value
+    return similarity_matrix
+
+def _similarity_numpy(x, y, max_distance):
+    # NumPy form of _similarity_kernel for when numba is not installed
+    n = len(x)
+    similarity_matrix = np.zeros((n, n))
+    for i in range(n):
+        if max_distance[i] == 0:
+            # A path that never moves has undefined (NaN) similarities, as in _similarity_kernel
+            similarity_matrix[i, i:] = np.nan
+            similarity_matrix[i:, i] = np.nan
+            continue
+        # Distances from path i to itself and every later path (upper triangle) in one broadcast
+        # (computed in place in two buffers instead of allocating a temporary per operation)
+        distance = np.subtract(x[i:], x[i])
+        np.square(distance, out=distance)
+        dy = np.subtract(y[i:], y[i])
+        distance += np.square(dy, out=dy)
+        np.sqrt(distance, out=distance)
+        similarity_matrix[i, i:] = 1 - np.clip(distance.mean(axis=1) / max_distance[i], 0, 1)
+        similarity_matrix[i:, i] = similarity_matrix[i, i:]
+    return similarity_matrix
+
+if HAVE_NUMBA:
+    # Compile once at import so the first reconstruction doesn't pay the JIT cost
+    _integrate_path(_kernel_input(np.zeros(2)), _kernel_input(np.zeros(2)), 1.0, 1.0)
+    _similarity_kernel(_kernel_input(np.zeros((1, 2)), np.float32), _kernel_input(np.zeros((1, 2)), np.float32),
+                       _kernel_input(np.ones(1)))
+
 class PathReconstructor:
     def __init__(self, wheel_base=2.5):
         self.wheel_base = wheel_base
 
-    def calculate_path(self, wheel_angle, speed, sampling_frequency):
+    def calculate_path(self, wheel_angle, speed, sampling_frequency, degrees=False):
         """
         Reconstruct the path of the car using a bicycle model.
         
-        :param wheel_angle: Array of steering angles (in radians).
+        :param wheel_angle: Array of steering angles (in radians, or in degrees if degrees is set).
         :param speed: Array of speed values (in m/s).
         :param sampling_frequency: Sampling frequency of the data (in Hz).
-        :return: x_path, y_path: Arrays of x and y positions.
+        :param degrees: Whether the steering angles are given in degrees.
+        :return: x_path, y_path: Arrays of x and y positions (float32).
         """
-        x, y, theta = 0, 0, 0
         dt = 1 / sampling_frequency
-        
-        x_path, y_path = [x], [y]
-        
-        for angle, spd in zip(wheel_angle, speed):
-            if spd == 0:
-                x_path.append(x)
-                y_path.append(y)
-                continue
-
-            if angle != 0:
-                R = self.wheel_base / np.tan(angle)
-            else:
-                R = np.inf
-            
-            if R != np.inf:
-                d_theta = spd * dt / R
-            else:
-                d_theta = 0
-            
-            theta += d_theta
-            x += spd * np.cos(theta) * dt
-            y += spd * np.sin(theta) * dt
-            
-            x_path.append(x)
-            y_path.append(y)
-        
-        return np.array(x_path), np.array(y_path)
+        if degrees:
+            wheel_angle = np.radians(wheel_angle, dtype=np.float64)
+        wheel_angle = _kernel_input(wheel_angle)
+        speed = _kernel_input(speed)
+        integrate = _integrate_path if HAVE_NUMBA else _integrate_path_numpy
+        return integrate(wheel_angle, speed, dt, self.wheel_base)
 
     def calculate_similarity(self, path1, path2):
         """
@@ -100,24 +598,11 @@ class PathReconstructor:
         :param path2: Tuple of (x_path, y_path) for the second path.
         :return: similarity_index: A value between 0 and 1.
         """
-        x1, y1 = path1
-        x2, y2 = path2
-
-        # Normalize paths to account for differences in starting points
-        x1 -= x1[0]
-        y1 -= y1[0]
-        x2 -= x2[0]
-        y2 -= y2[0]
-
-        # Resample paths to the same length for comparison
-        len1 = len(x1)
-        len2 = len(x2)
-        length = max(len1, len2)
-
-        x1_resampled = np.interp(np.linspace(0, 1, length), np.linspace(0, 1, len1), x1)
-        y1_resampled = np.interp(np.linspace(0, 1, length), np.linspace(0, 1, len1), y1)
-        x2_resampled = np.interp(np.linspace(0, 1, length), np.linspace(0, 1, len2), x2)
-        y2_resampled = np.interp(np.linspace(0, 1, length), np.linspace(0, 1, len2), y2)
+        # Shift both paths to start at the origin and resample them once to the same length for comparison
+        # (this also leaves the caller's arrays unmodified)
+        length = max(len(path1[0]), len(path2[0]))
+        x1_resampled, y1_resampled = self.resample_path(path1, length)
+        x2_resampled, y2_resampled = self.resample_path(path2, length)
 
         # Calculate Euclidean distance between resampled paths
         distance = np.sqrt((x1_resampled - x2_resampled) ** 2 + (y1_resampled - y2_resampled) ** 2)
@@ -128,20 +613,51 @@ class PathReconstructor:
         
         return similarity_index
 
+    def resample_path(self, path, length):
+        """
+        Shift a path to start at the origin and resample it to a fixed number of points.
+
+        :param path: Tuple of (x_path, y_path).
+        :param length: Number of points of the resampled path.
+        :return: x_resampled, y_resampled: Arrays of the resampled positions.
+        """
+        x, y = path
+        if len(x) == length:
+            # Already at the requested length: the interpolation would return the samples themselves
+            return x - x[0], y - y[0]
+        # x and y are interpolated together as the real and imaginary parts of one complex array,
+        # so the interpolation runs once for both coordinates
+        shifted = np.empty(len(x), dtype=np.complex128)
+        np.subtract(x, x[0], out=shifted.real)
+        np.subtract(y, y[0], out=shifted.imag)
+        resampled = np.interp(np.linspace(0, 1, length), np.linspace(0, 1, len(x)), shifted)
+        return resampled.real, resampled.imag
+
     def calculate_similarity_matrix(self, paths):
         """
         Calculate a similarity matrix for multiple paths.
+
+        Every path is resampled once to the length of the longest path, so the
+        pairwise distances are computed on stacked arrays instead of pair by pair.
         
         :param paths: Dictionary of {name: (x_path, y_path)} for each file.
         :return: similarity_matrix: DataFrame containing similarity indices.
         """
         names = list(paths.keys())
-        similarity_matrix = np.zeros((len(names), len(names)))
+        length = max(len(x_path) for x_path, _ in paths.values())
+        resampled = [self.resample_path(paths[name], length) for name in names]
+        # Stored as float32: positions from sensor data need no more precision, and it halves the memory
+        # the pairwise pass streams through
+        x = np.stack([x_resampled for x_resampled, _ in resampled], dtype=np.float32)
+        y = np.stack([y_resampled for _, y_resampled in resampled], dtype=np.float32)
+
+        # Extent of each path, used to normalize its distances to the others
+        max_distance = np.sqrt((x.max(axis=1) - x.min(axis=1))**2 + (y.max(axis=1) - y.min(axis=1))**2)
 
-        for i, name1 in enumerate(names):
-            for j, name2 in enumerate(names):
-                if i <= j:  # Compute only for upper triangle and diagonal
-                    similarity_matrix[i, j] = self.calculate_similarity(paths[name1], paths[name2])
-                    similarity_matrix[j, i] = similarity_matrix[i, j]
+        if HAVE_NUMBA:
+            similarity_matrix = _similarity_kernel(_kernel_input(x, np.float32), _kernel_input(y, np.float32),
+                                                   _kernel_input(max_distance))
+        else:
+            similarity_matrix = _similarity_numpy(x, y, max_distance)
 
         return pd.DataFrame(similarity_matrix, index=names, columns=names)